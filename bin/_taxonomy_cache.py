@@ -0,0 +1,193 @@
+"""
+Shared, memoized ete3 taxonomy lookups for the bioboxes scripts.
+
+Used by taxpasta_to_bioboxes.py and fix_gold_standard.py. Lookups are batched
+(one query each for ranks, lineages and names) and cached per process, so each
+taxid hits the NCBI taxonomy database at most once. The caches can also be
+persisted to a pickle file with load_cache()/save_cache() so later runs over
+the same taxa skip ete3 entirely. NCBITaxa itself is only opened on the first
+cache miss.
+
+Author: taxbencher pipeline
+"""
+
+import logging
+import os
+import pickle
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+# Bump when the pickled layout changes
+CACHE_FORMAT = 1
+
+# Process-local caches; NCBITaxa is not thread-safe, so these are never shared.
+# Unresolvable entries are stored too (None rank/name, empty lineage) so they
+# are not queried again.
+_RANK_CACHE: Dict[int, Optional[str]] = {}
+_LINEAGE_CACHE: Dict[int, Tuple[int, ...]] = {}
+_NAME_CACHE: Dict[int, Optional[str]] = {}
+_dirty = False
+_ncbi = None
+
+
+def get_ncbi():
+    """Return the shared NCBITaxa instance, opening the database on first use."""
+    global _ncbi
+    if _ncbi is None:
+        from ete3 import NCBITaxa
+        logging.info("Initializing NCBI taxonomy database")
+        _ncbi = NCBITaxa()
+    return _ncbi
+
+
+def default_db_file() -> str:
+    """Path of the taxonomy database that NCBITaxa() opens by default."""
+    return os.path.join(os.environ.get('HOME', '/'), '.etetoolkit', 'taxa.sqlite')
+
+
+@lru_cache(maxsize=None)
+def get_lineage(taxid: int) -> Tuple[int, ...]:
+    """Return the (memoized) lineage of a single taxid, empty if ete3 has none."""
+    return tuple(get_ncbi().get_lineage(taxid) or ())
+
+
+def get_names(taxids: Iterable[int]) -> Dict[int, Optional[str]]:
+    """Resolve scientific names, querying ete3 only for taxids not seen before."""
+    global _dirty
+    missing = [tid for tid in taxids if tid not in _NAME_CACHE]
+    if missing:
+        names = get_ncbi().get_taxid_translator(missing)
+        for tid in missing:
+            _NAME_CACHE[tid] = names.get(tid)
+        _dirty = True
+    return _NAME_CACHE
+
+
+def load_lineages(
+    taxids: Iterable[int],
+    unknown_name: str = 'taxid_{}',
+    with_ranks: bool = True
+) -> Tuple[Dict[int, str], Dict[int, str], Dict[int, str]]:
+    """
+    Resolve rank, TAXPATH and TAXPATHSN for many taxids at once.
+
+    Only taxids missing from the cache are queried. Taxids missing from the
+    batched lineage query (e.g. merged IDs) are retried one at a time through
+    get_lineage, which follows ete3's merged-taxid translation. Taxids that
+    still cannot be resolved are left out of the returned maps.
+
+    Args:
+        taxids: NCBI taxonomy IDs
+        unknown_name: Format string for lineage members without a name
+        with_ranks: Whether to look up ranks (skipped when the caller has them)
+
+    Returns:
+        Tuple of (rank_map, taxpath_map, taxpathsn_map) keyed by taxid
+    """
+    global _dirty
+    taxids = list(dict.fromkeys(int(taxid) for taxid in taxids))
+
+    rank_map = {}
+    if with_ranks:
+        missing = [taxid for taxid in taxids if taxid not in _RANK_CACHE]
+        if missing:
+            ranks = get_ncbi().get_rank(missing)
+            for taxid in missing:
+                _RANK_CACHE[taxid] = ranks.get(taxid)
+            _dirty = True
+        rank_map = {taxid: _RANK_CACHE[taxid] for taxid in taxids if _RANK_CACHE[taxid] is not None}
+
+    missing = [taxid for taxid in taxids if taxid not in _LINEAGE_CACHE]
+    if missing:
+        lineages = get_ncbi().get_lineage_translator(missing)
+        for taxid in missing:
+            lineage = lineages.get(taxid)
+            if lineage is None:
+                try:
+                    lineage = get_lineage(taxid)
+                except ValueError:
+                    lineage = ()
+            _LINEAGE_CACHE[taxid] = tuple(lineage)
+        _dirty = True
+
+    lineages = {taxid: _LINEAGE_CACHE[taxid] for taxid in taxids if _LINEAGE_CACHE[taxid]}
+    names = get_names({tid for lineage in lineages.values() for tid in lineage})
+
+    taxpath_map = {}
+    taxpathsn_map = {}
+    for taxid, lineage in lineages.items():
+        taxpath_map[taxid] = '|'.join(map(str, lineage))
+        taxpathsn_map[taxid] = '|'.join(names[tid] or unknown_name.format(tid) for tid in lineage)
+
+    return rank_map, taxpath_map, taxpathsn_map
+
+
+def _db_mtime() -> Optional[float]:
+    """Modification time of the taxonomy database, or None if it does not exist."""
+    try:
+        return os.path.getmtime(default_db_file())
+    except OSError:
+        return None
+
+
+def load_cache(cache_file: Path) -> bool:
+    """
+    Populate the in-memory caches from a file written by save_cache().
+
+    The cache is ignored if it was built against a taxonomy database with a
+    different modification time (e.g. after an NCBI taxonomy update).
+
+    Returns:
+        True if cached entries were loaded
+    """
+    try:
+        with open(cache_file, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return False
+
+    if not isinstance(data, dict) or data.get('format') != CACHE_FORMAT:
+        return False
+    if data.get('db_mtime') != _db_mtime():
+        return False
+
+    _RANK_CACHE.update(data['ranks'])
+    _LINEAGE_CACHE.update(data['lineages'])
+    _NAME_CACHE.update(data['names'])
+    return True
+
+
+def save_cache(cache_file: Path) -> bool:
+    """
+    Write the in-memory caches to cache_file if anything new was looked up.
+
+    The file is written to a temporary name and renamed into place, so
+    concurrent readers never see a partial cache.
+
+    Returns:
+        True if the cache file was written
+    """
+    global _dirty
+    if not _dirty:
+        return False
+
+    cache_file = Path(cache_file)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    data = {
+        'format': CACHE_FORMAT,
+        'db_mtime': _db_mtime(),
+        'ranks': _RANK_CACHE,
+        'lineages': _LINEAGE_CACHE,
+        'names': _NAME_CACHE
+    }
+    try:
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+    _dirty = False
+    return True
@@ -12,30 +12,108 @@ Author: Andreas Sjödin (with Claude Code assistance)
 """
 
 import argparse
+import html
+import importlib.util
+import os
 import sys
 from pathlib import Path
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings('ignore')
 
-try:
+# Heavy analysis dependencies (scikit-learn, plotly, scipy) are imported inside the
+# functions that use them; here we only check that they are installed
+_missing_modules = [
+    name for name in ('pandas', 'numpy', 'sklearn', 'plotly', 'scipy', 'joblib')
+    if importlib.util.find_spec(name) is None
+]
+if _missing_modules:
+    print(f"[comparative_analysis.py] WARNING: Missing dependencies: {', '.join(_missing_modules)}", file=sys.stderr)
+    print("[comparative_analysis.py] Falling back to placeholder mode", file=sys.stderr)
+    FULL_ANALYSIS = False
+else:
     import pandas as pd
     import numpy as np
-    from sklearn.decomposition import PCA
-    from sklearn.preprocessing import StandardScaler
-    import plotly.graph_objects as go
-    import plotly.express as px
-    from plotly.subplots import make_subplots
-    from scipy import stats
     FULL_ANALYSIS = True
-except ImportError as e:
-    print(f"[comparative_analysis.py] WARNING: Missing dependencies: {e}", file=sys.stderr)
-    print("[comparative_analysis.py] Falling back to placeholder mode", file=sys.stderr)
-    FULL_ANALYSIS = False
+
+# Optional: pyarrow and polars provide faster multi-threaded TSV readers; like the
+# analysis dependencies they are only imported by the readers that use them
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+# polars needs pyarrow to convert its frames to pandas
+HAS_POLARS = HAS_PYARROW and importlib.util.find_spec('polars') is not None
 
 __version__ = "1.1.0"
 
+# Static head of the comparison report; {title} and {head_scripts} are filled in per sample
+REPORT_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+    <title>{title}</title>
+{head_scripts}    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            margin: 40px;
+            background-color: #f5f5f5;
+        }}
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            background-color: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        h1 {{ color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }}
+        h2 {{ color: #666; margin-top: 30px; }}
+        .metric-grid {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 20px;
+            margin: 20px 0;
+        }}
+        .metric-card {{
+            background: #f9f9f9;
+            padding: 15px;
+            border-radius: 5px;
+            border-left: 4px solid #4CAF50;
+        }}
+        table {{
+            border-collapse: collapse;
+            width: 100%;
+            margin: 20px 0;
+        }}
+        th, td {{
+            text-align: left;
+            padding: 12px;
+            border-bottom: 1px solid #ddd;
+        }}
+        th {{
+            background-color: #4CAF50;
+            color: white;
+        }}
+        tr:hover {{background-color: #f5f5f5;}}
+        .plot-container {{
+            margin: 30px 0;
+        }}
+    </style>
+</head>
+<body>
+"""
+
+# Candidate column names for taxonomy IDs and abundances in bioboxes/profile tables
+TAXID_COLUMNS = ['TAXID', 'taxid', 'taxonomy_id', 'tax_id']
+ABUNDANCE_COLUMNS = ['PERCENTAGE', 'percentage', 'abundance', 'count', 'fraction']
+
+# Numeric columns that polars always reads as Float64 (OPAL metric values, taxonomy IDs
+# and abundances), whatever their first rows look like
+POLARS_FLOAT_COLUMNS = ('value', *TAXID_COLUMNS, *ABUNDANCE_COLUMNS)
+
+# Above this many metrics the PCA fit switches from covariance eigh to sklearn's randomized SVD
+EIGH_MAX_METRICS = 100
+
 
 def parse_args():
     """Parse command line arguments"""
@@ -72,6 +150,12 @@ def parse_args():
         required=True,
         help="Output file prefix"
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory for caching PCA fits across runs (default: no caching)"
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -81,6 +165,19 @@ def parse_args():
     return parser.parse_args()
 
 
+def _metrics_file_priority(name: str) -> int:
+    """Rank candidate OPAL metrics file names (lower is preferred)"""
+    if name == 'metrics.tsv':
+        return 0
+    if name == 'results.tsv':
+        return 1
+    if name.endswith('.metrics.tsv'):
+        return 2
+    if name.endswith('_metrics.tsv'):
+        return 3
+    return 4
+
+
 def parse_opal_metrics(opal_dir: Path):
     """
     Parse OPAL metrics files
@@ -89,25 +186,29 @@ def parse_opal_metrics(opal_dir: Path):
     """
     # OPAL typically outputs metrics in TSV files
     # Common file patterns: metrics.tsv, results.tsv, or similar
+    # A single directory scan; candidates are ranked in memory
+    try:
+        with os.scandir(opal_dir) as entries:
+            tsv_names = sorted(
+                entry.name for entry in entries
+                if entry.is_file() and entry.name.endswith('.tsv') and not entry.name.startswith('.')
+            )
+    except OSError as e:
+        print(f"[comparative_analysis.py] WARNING: Cannot read {opal_dir}: {e}", file=sys.stderr)
+        return None
 
-    metrics_files = []
-    for pattern in ['metrics.tsv', 'results.tsv', '*.metrics.tsv', '*_metrics.tsv']:
-        metrics_files.extend(list(opal_dir.glob(pattern)))
-
-    if not metrics_files:
-        # Try to find any TSV file
-        metrics_files = list(opal_dir.glob('*.tsv'))
-
-    if not metrics_files:
+    if not tsv_names:
         print(f"[comparative_analysis.py] WARNING: No metrics files found in {opal_dir}", file=sys.stderr)
         return None
 
-    # Use the first metrics file found
-    metrics_file = metrics_files[0]
+    # Use the best metrics file found (falls back to any TSV file)
+    metrics_file = opal_dir / min(tsv_names, key=_metrics_file_priority)
     print(f"[comparative_analysis.py] Parsing metrics from: {metrics_file}", file=sys.stderr)
 
     try:
-        df = pd.read_csv(metrics_file, sep='\t')
+        df = read_tsv_polars(metrics_file, try_parse_dates=False) if HAS_POLARS else None
+        if df is None:
+            df = pd.read_csv(metrics_file, sep='\t')
         print(f"[comparative_analysis.py] Loaded metrics: {df.shape[0]} rows, {df.shape[1]} columns", file=sys.stderr)
         print(f"[comparative_analysis.py] Columns: {list(df.columns)}", file=sys.stderr)
         return df
@@ -116,54 +217,154 @@ def parse_opal_metrics(opal_dir: Path):
         return None
 
 
+def read_tsv_polars(tsv_file: Path, **kwargs):
+    """
+    Read a TSV file with polars into a pandas DataFrame
+
+    The schema is inferred from the whole file and POLARS_FLOAT_COLUMNS are read as
+    Float64, so a column that turns into floats or 'nan' late in the file does not
+    fail the read. Returns None if polars still cannot type the file, so callers can
+    fall back to another reader instead of silently dropping the table.
+    """
+    import polars as pl
+    try:
+        return pl.read_csv(
+            tsv_file, separator='\t', infer_schema_length=None,
+            schema_overrides=dict.fromkeys(POLARS_FLOAT_COLUMNS, pl.Float64), **kwargs
+        ).to_pandas()
+    except pl.exceptions.ComputeError:
+        print(f"[comparative_analysis.py] WARNING: polars could not type the columns of {tsv_file}; using pandas", file=sys.stderr)
+        return None
+
+
+def read_bioboxes_table(bioboxes_file: Path):
+    """
+    Read the tabular part of a bioboxes file in a single pass
+
+    Metadata headers starting with @ are skipped by the parser itself.
+    """
+    if HAS_POLARS:
+        df = read_tsv_polars(bioboxes_file, comment_prefix='@')
+        if df is not None:
+            return df
+        return pd.read_csv(bioboxes_file, sep='\t', comment='@')
+    if HAS_PYARROW:
+        from pyarrow import csv as pacsv
+        # pyarrow has no comment support; skip the leading @ header block instead
+        with open(bioboxes_file, 'r') as f:
+            n_header_lines = 0
+            for line in f:
+                if not line.startswith('@'):
+                    break
+                n_header_lines += 1
+        table = pacsv.read_csv(
+            bioboxes_file,
+            read_options=pacsv.ReadOptions(skip_rows=n_header_lines, use_threads=True),
+            parse_options=pacsv.ParseOptions(delimiter='\t'),
+            convert_options=pacsv.ConvertOptions(null_values=['', 'NA'])
+        )
+        return table.to_pandas()
+    return pd.read_csv(bioboxes_file, sep='\t', comment='@')
+
+
+def load_bioboxes_profile(bioboxes_dir: Path, label: str):
+    """
+    Locate and parse the bioboxes profile for one classifier
+
+    Returns DataFrame of taxa abundances, or None if no usable profile was found
+    """
+    # Look for bioboxes file matching this label
+    bioboxes_file = bioboxes_dir / f"{label}.bioboxes"
+    if not bioboxes_file.exists():
+        # Try alternative patterns
+        matches = list(bioboxes_dir.glob(f"*{label}*.bioboxes"))
+        if matches:
+            bioboxes_file = matches[0]
+        else:
+            print(f"[comparative_analysis.py] WARNING: No bioboxes file found for {label}", file=sys.stderr)
+            return None
+
+    try:
+        df = read_bioboxes_table(bioboxes_file)
+        if len(df) >= 1:
+            print(f"[comparative_analysis.py] Loaded profile {label}: {len(df)} taxa", file=sys.stderr)
+            return df
+    except Exception as e:
+        print(f"[comparative_analysis.py] WARNING: Error parsing {bioboxes_file}: {e}", file=sys.stderr)
+
+    return None
+
+
 def parse_bioboxes_profiles(bioboxes_dir: Path, labels: list):
     """
     Parse bioboxes profiles to extract taxa abundances
 
+    Profiles are independent, so they are parsed concurrently (one thread per classifier,
+    bounded by the CPU count).
+
     Returns dict mapping label -> DataFrame of taxa abundances
     """
-    profiles = {}
-
-    for label in labels:
-        # Look for bioboxes file matching this label
-        bioboxes_file = bioboxes_dir / f"{label}.bioboxes"
-        if not bioboxes_file.exists():
-            # Try alternative patterns
-            matches = list(bioboxes_dir.glob(f"*{label}*.bioboxes"))
-            if matches:
-                bioboxes_file = matches[0]
-            else:
-                print(f"[comparative_analysis.py] WARNING: No bioboxes file found for {label}", file=sys.stderr)
-                continue
+    max_workers = max(1, min(len(labels), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        loaded = list(executor.map(lambda label: load_bioboxes_profile(bioboxes_dir, label), labels))
+
+    return {label: df for label, df in zip(labels, loaded) if df is not None}
 
-        try:
-            # Parse bioboxes file (skip metadata headers starting with @)
-            with open(bioboxes_file, 'r') as f:
-                lines = [line for line in f if not line.startswith('@') and line.strip()]
-
-            if len(lines) > 1:
-                # First non-@ line should be header
-                df = pd.read_csv(bioboxes_file, sep='\t', comment='@', skiprows=0)
-                profiles[label] = df
-                print(f"[comparative_analysis.py] Loaded profile {label}: {len(df)} taxa", file=sys.stderr)
-        except Exception as e:
-            print(f"[comparative_analysis.py] WARNING: Error parsing {bioboxes_file}: {e}", file=sys.stderr)
 
-    return profiles
+def fit_pca(scaled_metrics, n_components: int):
+    """
+    Fit PCA on standardized metrics
 
+    The matrix is classifiers x metrics, so for the usual handful of metrics the
+    principal axes come straight from an eigendecomposition of the covariance
+    matrix; sklearn's randomized PCA is only used for wide inputs.
 
-def perform_pca_analysis(metrics_df: pd.DataFrame, labels: list, sample_id: str, output_file: Path):
+    Returns tuple of (projected coordinates, explained variance ratio)
+    """
+    if scaled_metrics.shape[1] > EIGH_MAX_METRICS:
+        from sklearn.decomposition import PCA
+
+        # Only 1-2 components are used, so a randomized truncated SVD avoids the full decomposition
+        pca = PCA(n_components=n_components, svd_solver='randomized', iterated_power=4, random_state=0)
+        pca_result = pca.fit_transform(scaled_metrics)
+        return pca_result, pca.explained_variance_ratio_
+
+    # Center explicitly before forming the covariance so large column means cannot cause
+    # catastrophic cancellation, then let BLAS compute Xc.T @ Xc in a single GEMM
+    centered = scaled_metrics - scaled_metrics.mean(axis=0, keepdims=True)
+    cov = (centered.T @ centered) / (centered.shape[0] - 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+
+    # eigh returns ascending eigenvalues; keep the largest first
+    order = np.argsort(eigenvalues)[::-1]
+    eigenvalues = eigenvalues[order]
+    components = eigenvectors[:, order[:n_components]]
+
+    # Deterministic signs: largest absolute loading of each component is positive
+    max_rows = np.argmax(np.abs(components), axis=0)
+    components = components * np.sign(components[max_rows, range(n_components)])
+
+    pca_result = centered @ components
+    explained_variance = eigenvalues[:n_components] / eigenvalues.sum()
+    return pca_result, explained_variance
+
+
+def perform_pca_analysis(metrics_df: 'pd.DataFrame', labels: list, sample_id: str, output_file: Path,
+                         memory=None):
     """
     Perform PCA on classifier performance metrics
 
-    Creates interactive Plotly visualization
+    Creates interactive Plotly visualization. If a joblib Memory is given,
+    the PCA fit is cached keyed by the standardized input matrix.
     """
+    import plotly.graph_objects as go
+
     print(f"[comparative_analysis.py] Performing PCA analysis...", file=sys.stderr)
 
     # Identify metric columns (excluding metadata columns)
-    metadata_cols = ['tool', 'rank', 'sample', 'label', 'classifier', 'Tool', 'Rank', 'Sample', 'Label', 'Classifier']
-    metric_cols = [col for col in metrics_df.columns if col not in metadata_cols and
-                   metrics_df[col].dtype in ['float64', 'int64', 'float32', 'int32']]
+    metadata_cols = {'tool', 'rank', 'sample', 'label', 'classifier', 'Tool', 'Rank', 'Sample', 'Label', 'Classifier'}
+    metric_cols = [col for col in metrics_df.select_dtypes(include='number').columns
+                   if col not in metadata_cols]
 
     if len(metric_cols) < 2:
         print(f"[comparative_analysis.py] WARNING: Need at least 2 numeric metrics for PCA, found {len(metric_cols)}", file=sys.stderr)
@@ -197,14 +398,25 @@ def perform_pca_analysis(metrics_df: pd.DataFrame, labels: list, sample_id: str,
             create_placeholder_pca(sample_id, labels, output_file)
             return
 
-        # Standardize features
-        scaler = StandardScaler()
-        scaled_metrics = scaler.fit_transform(agg_metrics)
+        if agg_metrics.var().sum() == 0:
+            print(f"[comparative_analysis.py] WARNING: All metrics are constant across classifiers, PCA is undefined", file=sys.stderr)
+            create_placeholder_pca(sample_id, labels, output_file)
+            return
+
+        # Standardize features on a float32 matrix; the metrics need far less precision
+        # than float64 and the covariance/eigh step runs on half the bytes. Same result as
+        # StandardScaler (population std, constant columns left unscaled) without the
+        # estimator's validation overhead on this tiny matrix
+        X = np.ascontiguousarray(agg_metrics.to_numpy(dtype=np.float32))
+        mu = X.mean(axis=0)
+        sigma = X.std(axis=0)
+        sigma[sigma < 1e-12] = 1.0
+        scaled_metrics = (X - mu) / sigma
 
         # Perform PCA
         n_components = min(2, len(agg_metrics) - 1, len(metric_cols))
-        pca = PCA(n_components=n_components)
-        pca_result = pca.fit_transform(scaled_metrics)
+        fit = memory.cache(fit_pca) if memory is not None else fit_pca
+        pca_result, explained_variance = fit(scaled_metrics, n_components)
 
         # Create interactive Plotly plot
         if n_components >= 2:
@@ -218,7 +430,7 @@ def perform_pca_analysis(metrics_df: pd.DataFrame, labels: list, sample_id: str,
                 textposition='top center',
                 marker=dict(
                     size=15,
-                    color=range(len(agg_metrics)),
+                    color=list(range(len(agg_metrics))),
                     colorscale='Viridis',
                     showscale=True,
                     colorbar=dict(title="Classifier Index")
@@ -228,8 +440,8 @@ def perform_pca_analysis(metrics_df: pd.DataFrame, labels: list, sample_id: str,
 
             fig.update_layout(
                 title=f'Classifier Performance PCA - {sample_id}',
-                xaxis_title=f'PC1 ({pca.explained_variance_ratio_[0]:.1%} variance)',
-                yaxis_title=f'PC2 ({pca.explained_variance_ratio_[1]:.1%} variance)',
+                xaxis_title=f'PC1 ({explained_variance[0]:.1%} variance)',
+                yaxis_title=f'PC2 ({explained_variance[1]:.1%} variance)',
                 hovermode='closest',
                 template='plotly_white',
                 width=800,
@@ -248,7 +460,7 @@ def perform_pca_analysis(metrics_df: pd.DataFrame, labels: list, sample_id: str,
             ))
             fig.update_layout(
                 title=f'Classifier Performance PCA - {sample_id}',
-                xaxis_title=f'PC1 ({pca.explained_variance_ratio_[0]:.1%} variance)',
+                xaxis_title=f'PC1 ({explained_variance[0]:.1%} variance)',
                 yaxis_title='',
                 template='plotly_white'
             )
@@ -258,7 +470,7 @@ def perform_pca_analysis(metrics_df: pd.DataFrame, labels: list, sample_id: str,
         print(f"[comparative_analysis.py] Created PCA plot: {output_file}", file=sys.stderr)
 
         # Print explained variance
-        print(f"[comparative_analysis.py] PCA explained variance: {pca.explained_variance_ratio_}", file=sys.stderr)
+        print(f"[comparative_analysis.py] PCA explained variance: {explained_variance}", file=sys.stderr)
 
     except Exception as e:
         print(f"[comparative_analysis.py] ERROR in PCA analysis: {e}", file=sys.stderr)
@@ -292,99 +504,103 @@ def create_placeholder_pca(sample_id: str, labels: list, output_file: Path):
         f.write(html_content)
 
 
+def find_column(df, candidates: list):
+    """Return the last of the candidate column names present in df, or None"""
+    return next((col for col in reversed(candidates) if col in df.columns), None)
+
+
+@lru_cache(maxsize=4)
+def load_gold_abundances(gold_standard: Path):
+    """
+    Load gold standard abundances as a Series indexed by taxonomy ID
+
+    Cached per path so repeated analyses against the same gold standard parse it once.
+    Returns None if no taxonomy ID or abundance column can be identified.
+    """
+    gold_df = read_bioboxes_table(gold_standard)
+    print(f"[comparative_analysis.py] Loaded gold standard: {len(gold_df)} taxa", file=sys.stderr)
+
+    taxid_col = find_column(gold_df, TAXID_COLUMNS)
+    pct_col = find_column(gold_df, ABUNDANCE_COLUMNS)
+    if not taxid_col or not pct_col:
+        return None
+
+    return pd.Series(gold_df[pct_col].to_numpy(dtype=float), index=gold_df[taxid_col])
+
+
 def perform_differential_abundance(gold_standard: Path, profiles: dict, labels: list,
                                    output_file: Path):
     """
     Identify taxa significantly different from gold standard
 
-    Uses chi-square or similar statistical test
+    Uses a per-taxon chi-square test with Benjamini-Hochberg correction
     """
+    from scipy import stats
+
     print(f"[comparative_analysis.py] Performing differential abundance analysis...", file=sys.stderr)
 
-    # Parse gold standard
+    # Parse gold standard (taxonomy ID and abundance columns are resolved once, not per classifier)
     try:
-        with open(gold_standard, 'r') as f:
-            lines = [line for line in f if not line.startswith('@') and line.strip()]
-
-        gold_df = pd.read_csv(gold_standard, sep='\t', comment='@')
-        print(f"[comparative_analysis.py] Loaded gold standard: {len(gold_df)} taxa", file=sys.stderr)
+        gold_series = load_gold_abundances(gold_standard)
     except Exception as e:
         print(f"[comparative_analysis.py] ERROR loading gold standard: {e}", file=sys.stderr)
         create_placeholder_diff_taxa(output_file)
         return
 
+    if gold_series is None:
+        print(f"[comparative_analysis.py] WARNING: Could not find taxonomy ID and abundance columns in gold standard", file=sys.stderr)
+        create_placeholder_diff_taxa(output_file)
+        return
+
     # Create differential abundance table
     diff_results = []
 
     for label, profile_df in profiles.items():
         try:
-            # Merge with gold standard on taxonomy ID
-            # Common column names: TAXID, taxid, taxonomy_id, etc.
-            taxid_cols = ['TAXID', 'taxid', 'taxonomy_id', 'tax_id']
-            gold_taxid = None
-            profile_taxid = None
-
-            for col in taxid_cols:
-                if col in gold_df.columns:
-                    gold_taxid = col
-                if col in profile_df.columns:
-                    profile_taxid = col
-
-            if not gold_taxid or not profile_taxid:
+            profile_taxid = find_column(profile_df, TAXID_COLUMNS)
+            if not profile_taxid:
                 print(f"[comparative_analysis.py] WARNING: Could not find taxonomy ID columns for {label}", file=sys.stderr)
                 continue
 
-            # Get percentage/abundance columns
-            pct_cols = ['PERCENTAGE', 'percentage', 'abundance', 'count', 'fraction']
-            gold_pct = None
-            profile_pct = None
-
-            for col in pct_cols:
-                if col in gold_df.columns:
-                    gold_pct = col
-                if col in profile_df.columns:
-                    profile_pct = col
-
-            if not gold_pct or not profile_pct:
+            profile_pct = find_column(profile_df, ABUNDANCE_COLUMNS)
+            if not profile_pct:
                 print(f"[comparative_analysis.py] WARNING: Could not find abundance columns for {label}", file=sys.stderr)
                 continue
 
-            # Merge profiles
-            merged = pd.merge(
-                gold_df[[gold_taxid, gold_pct]],
-                profile_df[[profile_taxid, profile_pct]],
-                left_on=gold_taxid,
-                right_on=profile_taxid,
-                how='outer',
-                suffixes=('_gold', '_obs')
-            )
+            # Align abundances on taxonomy ID; align() fills taxa missing on either side
+            # with 0 while reindexing, so no NaN intermediate is materialized
+            profile_series = pd.Series(profile_df[profile_pct].to_numpy(dtype=float), index=profile_df[profile_taxid])
+            observed_series, expected_series = profile_series.align(gold_series, join='outer', fill_value=0.0)
 
-            merged = merged.fillna(0)
+            observed = observed_series.to_numpy()
+            expected = expected_series.to_numpy()
+            # Blank or non-numeric taxonomy IDs become NaN labels in the union index
+            taxids = pd.to_numeric(observed_series.index, errors='coerce').to_numpy(dtype=float)
 
             # Perform statistical test (chi-square for count data)
-            # For each taxon, test if observed differs from expected
-            for _, row in merged.iterrows():
-                taxid = row.get(gold_taxid) or row.get(profile_taxid)
-                expected = row.get(f'{gold_pct}_gold', 0) or row.get(gold_pct, 0)
-                observed = row.get(f'{profile_pct}_obs', 0) or row.get(profile_pct, 0)
-
-                # Simple difference test (can be enhanced with proper statistical test)
-                diff = abs(observed - expected)
-
-                if diff > 1.0:  # Threshold: 1% difference
-                    # Calculate p-value (simplified - in production use proper test)
-                    # Here we use a simple threshold-based approach
-                    p_value = 0.05 if diff > 5.0 else 0.1
-
-                    diff_results.append({
-                        'taxid': int(taxid) if pd.notna(taxid) else -1,
-                        'rank': '',  # Can be extracted if available
-                        'taxname': '',  # Can be extracted if available
-                        'observed_pct': float(observed),
-                        'expected_pct': float(expected),
-                        'p_value': p_value,
-                        'classifier': label
-                    })
+            # Each taxon is tested against the rest of the profile (taxon vs. other, 1 df),
+            # treating percentages as counts out of 100. Taxa absent from the gold standard
+            # get a small expected proportion so the statistic stays finite.
+            diff = np.abs(observed - expected)
+            p_expected = np.clip(expected / 100.0, 1e-6, 1.0 - 1e-6)
+            chi2_stat = (diff / 100.0) ** 2 * 100.0 / (p_expected * (1.0 - p_expected))
+            p_values = stats.chi2.sf(chi2_stat, df=1)
+
+            # Benjamini-Hochberg correction across all taxa of this classifier
+            q_values = stats.false_discovery_control(p_values, method='bh')
+
+            mask = diff > 1.0  # Threshold: 1% difference
+            if mask.any():
+                # Missing taxonomy IDs are written as -1 rather than cast from NaN
+                hit_taxids = taxids[mask]
+                diff_results.append((
+                    label,
+                    np.where(np.isnan(hit_taxids), -1, hit_taxids).astype(int),
+                    observed[mask],
+                    expected[mask],
+                    p_values[mask],
+                    q_values[mask]
+                ))
 
         except Exception as e:
             print(f"[comparative_analysis.py] ERROR in diff abundance for {label}: {e}", file=sys.stderr)
@@ -392,10 +608,32 @@ def perform_differential_abundance(gold_standard: Path, profiles: dict, labels:
 
     # Write results
     if diff_results:
-        diff_df = pd.DataFrame(diff_results)
+        # Build the table once from concatenated per-classifier column arrays
+        hit_labels, taxid_parts, observed_parts, expected_parts, p_parts, q_parts = zip(*diff_results)
+        diff_df = pd.DataFrame({
+            'taxid': np.concatenate(taxid_parts),
+            'rank': '',  # Can be extracted if available
+            'taxname': '',  # Can be extracted if available
+            'observed_pct': np.concatenate(observed_parts),
+            'expected_pct': np.concatenate(expected_parts),
+            'p_value': np.concatenate(p_parts),
+            'q_value': np.concatenate(q_parts),
+            'classifier': np.repeat(hit_labels, [len(part) for part in taxid_parts])
+        })
         diff_df = diff_df.sort_values('p_value')
         diff_df.to_csv(output_file, sep='\t', index=False)
         print(f"[comparative_analysis.py] Found {len(diff_df)} differentially abundant taxa", file=sys.stderr)
+
+        # Typed, compressed companion for downstream tools; the TSV stays the primary output
+        # (optional, so a pyarrow or codec failure must not take the report down with it)
+        if HAS_PYARROW:
+            parquet_file = output_file.with_suffix('.parquet')
+            try:
+                diff_df.to_parquet(parquet_file, compression='zstd', engine='pyarrow', index=False)
+                print(f"[comparative_analysis.py] Wrote Parquet companion: {parquet_file}", file=sys.stderr)
+            except Exception as e:
+                print(f"[comparative_analysis.py] WARNING: Could not write Parquet companion {parquet_file}: {e}", file=sys.stderr)
+                parquet_file.unlink(missing_ok=True)
     else:
         create_placeholder_diff_taxa(output_file)
 
@@ -403,7 +641,7 @@ def perform_differential_abundance(gold_standard: Path, profiles: dict, labels:
 def create_placeholder_diff_taxa(output_file: Path):
     """Create placeholder differential taxa file"""
     with open(output_file, 'w') as f:
-        f.write("taxid\trank\ttaxname\tobserved_pct\texpected_pct\tp_value\tclassifier\n")
+        f.write("taxid\trank\ttaxname\tobserved_pct\texpected_pct\tp_value\tq_value\tclassifier\n")
         f.write("# No significant differential taxa found or analysis could not be performed\n")
 
 
@@ -412,6 +650,11 @@ def create_comparison_report(sample_id: str, labels: list, metrics_df,
     """
     Create comprehensive HTML comparison report with Plotly visualizations
     """
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.offline import get_plotlyjs_version
+    from plotly.subplots import make_subplots
+
     print(f"[comparative_analysis.py] Creating comparison report...", file=sys.stderr)
 
     # Create plotly visualizations
@@ -434,100 +677,99 @@ def create_comparison_report(sample_id: str, labels: list, metrics_df,
 
             if rank_col and classifier_col:
                 # Per-rank performance comparison
-                metric_cols = [col for col in metrics_df.columns
-                             if col not in [rank_col, classifier_col] and
-                             metrics_df[col].dtype in ['float64', 'int64']]
+                metric_cols = [col for col in metrics_df.select_dtypes(include='number').columns
+                               if col not in {rank_col, classifier_col}]
 
                 if metric_cols:
-                    # Create subplot for first few metrics
-                    for metric in metric_cols[:4]:  # Show top 4 metrics
-                        fig = px.bar(
-                            metrics_df,
-                            x=rank_col,
-                            y=metric,
-                            color=classifier_col,
-                            barmode='group',
-                            title=f'{metric} by Rank and Classifier'
+                    # One subplot grid for the first few metrics, built from a single reshape
+                    plot_metrics = metric_cols[:4]  # Show top 4 metrics
+                    long_df = metrics_df.melt(
+                        id_vars=[rank_col, classifier_col],
+                        value_vars=plot_metrics,
+                        var_name='_metric',
+                        value_name='_value'
+                    )
+
+                    n_cols = min(2, len(plot_metrics))
+                    n_rows = (len(plot_metrics) + n_cols - 1) // n_cols
+                    fig = make_subplots(rows=n_rows, cols=n_cols, subplot_titles=plot_metrics)
+
+                    palette = px.colors.qualitative.Plotly
+                    metric_pos = {metric: i for i, metric in enumerate(plot_metrics)}
+                    classifier_color = {
+                        classifier: palette[i % len(palette)]
+                        for i, classifier in enumerate(long_df[classifier_col].dropna().unique())
+                    }
+
+                    for (metric, classifier), group in long_df.groupby(['_metric', classifier_col], sort=False):
+                        pos = metric_pos[metric]
+                        fig.add_trace(
+                            go.Bar(
+                                x=group[rank_col],
+                                y=group['_value'],
+                                name=str(classifier),
+                                legendgroup=str(classifier),
+                                marker_color=classifier_color[classifier],
+                                showlegend=pos == 0
+                            ),
+                            row=pos // n_cols + 1,
+                            col=pos % n_cols + 1
                         )
-                        figs.append(fig.to_html(full_html=False, include_plotlyjs='cdn'))
+
+                    fig.update_layout(
+                        title='Metrics by Rank and Classifier',
+                        barmode='group',
+                        height=400 * n_rows
+                    )
+                    figs.append(fig.to_html(
+                        full_html=False,
+                        include_plotlyjs=False,
+                        div_id='fig_metrics',
+                        config={'displaylogo': False}
+                    ))
         except Exception as e:
             print(f"[comparative_analysis.py] ERROR creating metric plots: {e}", file=sys.stderr)
 
-    # Build HTML report
-    html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Classifier Comparison - {sample_id}</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            margin: 40px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{ color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }}
-        h2 {{ color: #666; margin-top: 30px; }}
-        .metric-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin: 20px 0;
-        }}
-        .metric-card {{
-            background: #f9f9f9;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #4CAF50;
-        }}
-        table {{
-            border-collapse: collapse;
-            width: 100%;
-            margin: 20px 0;
-        }}
-        th, td {{
-            text-align: left;
-            padding: 12px;
-            border-bottom: 1px solid #ddd;
-        }}
-        th {{
-            background-color: #4CAF50;
-            color: white;
-        }}
-        tr:hover {{background-color: #f5f5f5;}}
-        .plot-container {{
-            margin: 30px 0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Classifier Comparison Report - {sample_id}</h1>
+    # Stream the HTML report piece by piece instead of building it in memory
+    sample_id_html = html.escape(sample_id)
+
+    with open(output_file, 'w') as f:
+        # Load plotly.js once for all figures instead of once per figure
+        head_scripts = (
+            f'    <script charset="utf-8" src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>\n'
+            if figs else ''
+        )
+        f.write(REPORT_HEADER.format(title=f"Classifier Comparison - {sample_id_html}", head_scripts=head_scripts))
+        f.write(f"""    <div class="container">
+        <h1>Classifier Comparison Report - {sample_id_html}</h1>
 
         <h2>Classifiers Analyzed</h2>
         <div class="metric-grid">
-            {''.join([f'<div class="metric-card"><strong>{label}</strong></div>' for label in labels])}
-        </div>
+""")
+        for label in labels:
+            f.write(f'            <div class="metric-card"><strong>{html.escape(label)}</strong></div>\n')
+        f.write(f"""        </div>
 
         <h2>Analysis Components</h2>
         <ul>
-            <li><strong>PCA Analysis:</strong> <a href="{pca_file.name}">View PCA plot</a></li>
-            <li><strong>Differential Taxa:</strong> <a href="{diff_taxa_file.name}">View differential abundance table</a></li>
+            <li><strong>PCA Analysis:</strong> <a href="{html.escape(pca_file.name)}">View PCA plot</a></li>
+            <li><strong>Differential Taxa:</strong> <a href="{html.escape(diff_taxa_file.name)}">View differential abundance table</a></li>
             <li><strong>Performance Metrics:</strong> See visualizations below</li>
         </ul>
 
         <h2>Performance Visualizations</h2>
-        {''.join([f'<div class="plot-container">{fig_html}</div>' for fig_html in figs]) if figs else '<p><em>Visualizations require OPAL metrics data</em></p>'}
-
+""")
+        if figs:
+            for fig_html in figs:
+                f.write('        <div class="plot-container">')
+                f.write(fig_html)
+                f.write('</div>\n')
+        else:
+            f.write('        <p><em>Visualizations require OPAL metrics data</em></p>\n')
+        f.write(f"""
         <h2>Summary Statistics</h2>
         <p>Number of classifiers: {len(labels)}</p>
-        <p>Sample ID: {sample_id}</p>
+        <p>Sample ID: {sample_id_html}</p>
 
         <hr>
         <p style="text-align: center; color: #666; font-size: 12px;">
@@ -536,10 +778,7 @@ def create_comparison_report(sample_id: str, labels: list, metrics_df,
     </div>
 </body>
 </html>
-"""
-
-    with open(output_file, 'w') as f:
-        f.write(html_content)
+""")
 
     print(f"[comparative_analysis.py] Created comparison report: {output_file}", file=sys.stderr)
 
@@ -585,13 +824,17 @@ def main():
 """)
     else:
         # Full analysis mode
+        from joblib import Memory
+
+        memory = Memory(args.cache_dir, verbose=0) if args.cache_dir else None
+
         try:
             # Parse OPAL metrics
             metrics_df = parse_opal_metrics(args.opal_dir)
 
             # Perform PCA analysis
             if metrics_df is not None:
-                perform_pca_analysis(metrics_df, labels, args.sample_id, pca_html)
+                perform_pca_analysis(metrics_df, labels, args.sample_id, pca_html, memory)
             else:
                 create_placeholder_pca(args.sample_id, labels, pca_html)
 
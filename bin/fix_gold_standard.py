@@ -3,101 +3,111 @@
 Fix gold standard bioboxes file by reconstructing proper TAXPATH and TAXPATHSN.
 """
 
+import csv
+import io
 import sys
 import argparse
-from ete3 import NCBITaxa
+import pandas as pd
 
-def fix_gold_standard(input_file, output_file, sample_id='gold_standard'):
-    """Fix gold standard file by reconstructing TAXPATH and TAXPATHSN from taxids."""
+from _taxonomy_cache import load_cache, load_lineages, save_cache
 
-    print(f"Initializing NCBI taxonomy database...")
-    ncbi = NCBITaxa()
+# Valid ranks for OPAL (standard CAMI ranks), plus subspecies mapped to strain;
+# unsupported ranks are absent and get skipped
+RANK_LUT = {rank: rank for rank in ('superkingdom', 'phylum', 'class', 'order', 'family', 'genus', 'species', 'strain')}
+RANK_LUT['subspecies'] = 'strain'
 
-    print(f"Reading input file: {input_file}")
 
-    # Read the input file
-    data_lines = []
-    with open(input_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('@') or line.startswith('#'):
-                continue
-            data_lines.append(line)
+def fix_gold_standard(input_file, output_file, sample_id='gold_standard', cache_file=None):
+    """Fix gold standard file by reconstructing TAXPATH and TAXPATHSN from taxids."""
 
-    print(f"Processing {len(data_lines)} entries...")
+    # Reuse lookups from earlier runs; stale caches (older taxonomy DB) are ignored.
+    # The NCBI taxonomy database itself is only opened on the first cache miss.
+    if cache_file and load_cache(cache_file):
+        print(f"Loaded taxonomy cache: {cache_file}")
 
-    # Valid ranks for OPAL (standard CAMI ranks)
-    valid_ranks = {'superkingdom', 'phylum', 'class', 'order', 'family', 'genus', 'species', 'strain'}
+    print(f"Reading input file: {input_file}")
 
-    # Map subspecies to strain
-    rank_mapping = {'subspecies': 'strain'}
+    # Skip the header block (@SampleID, @Ranks, @@TAXID, ...) with a short line loop,
+    # then hand the rest of the file to the pandas C parser
+    with open(input_file, 'r', buffering=1 << 20) as f:
+        data_start = f.tell()
+        line = f.readline()
+        while line and (not line.strip() or line.startswith(('@', '#'))):
+            data_start = f.tell()
+            line = f.readline()
+        f.seek(data_start)
+        body = f.read()
+
+    # Rows are positional (4 or 5 fields). Read as many columns as the widest row has,
+    # so rows with extra (or trailing empty) fields reach the malformed-line check below
+    # instead of being dropped by the parser
+    n_columns = max((line.count('\t') for line in body.split('\n')), default=0) + 1
+    data = pd.read_csv(io.StringIO(body), sep='\t', header=None, names=range(max(n_columns, 6)),
+                       dtype=str, keep_default_na=False, skip_blank_lines=True, index_col=False,
+                       quoting=csv.QUOTE_NONE, engine='c')
+
+    # Comment/header lines may also appear between data rows
+    data = data[~data[0].str.startswith(('@', '#'))]
+    # Field count up to the last non-empty field (trailing tabs are ignored, as with strip())
+    n_fields = data.ne('').iloc[:, ::-1].cummax(axis=1).sum(axis=1)
+
+    print(f"Processing {len(data)} entries...")
+
+    # Assume format: TAXID, RANK, TAXPATHSN (or TAXPATH), PERCENTAGE
+    # Or: TAXID, RANK, TAXPATH, TAXPATHSN, PERCENTAGE
+    malformed = ~n_fields.isin((4, 5))
+    for idx, row in data[malformed].iterrows():
+        line = '\t'.join(row[:n_fields[idx]])
+        print(f"Warning: Skipping malformed line: {line}")
+    data, n_fields = data[~malformed], n_fields[~malformed]
+
+    # Skip unsupported ranks, map subspecies to strain
+    ranks = data[1].map(RANK_LUT)
+    supported = ranks.notna()
+    skipped = int((~supported).sum())
+    data, n_fields, ranks = data[supported], n_fields[supported], ranks[supported]
+
+    # Only rows that survive the rank filter pay for numeric parsing
+    taxids = data[0].str.strip().astype('int64')
+    percentages = data[3].where(n_fields == 4, data[4]).str.strip()
+    values = percentages.astype('float64')
+
+    rows = list(zip(taxids, ranks, percentages, values))
+
+    # Batched, memoized TAXPATH/TAXPATHSN lookup for every distinct taxid
+    _, taxpath_map, taxpathsn_map = load_lineages(
+        [row[0] for row in rows], unknown_name='unknown_{}', with_ranks=False
+    )
 
     # Process each row
     results = []
-    skipped = 0
-    for line in data_lines:
-        parts = line.split('\t')
-
-        # Assume format: TAXID, RANK, TAXPATHSN (or TAXPATH), PERCENTAGE
-        # Or: TAXID, RANK, TAXPATH, TAXPATHSN, PERCENTAGE
-        if len(parts) == 4:
-            taxid, rank, taxpathsn_or_taxpath, percentage = parts
-        elif len(parts) == 5:
-            taxid, rank, _, taxpathsn_or_taxpath, percentage = parts
-        else:
-            print(f"Warning: Skipping malformed line: {line}")
-            continue
-
-        taxid = int(taxid)
-
-        # Skip unsupported ranks
-        if rank not in valid_ranks and rank not in rank_mapping:
-            skipped += 1
+    percentages_out = []
+    kept_values = []
+    for taxid, rank, percentage, value in rows:
+        if taxid not in taxpath_map:
+            print(f"Warning: No lineage found for taxid {taxid}, skipping")
             continue
 
-        # Map subspecies to strain
-        if rank in rank_mapping:
-            rank = rank_mapping[rank]
-
-        # Get full lineage from NCBI
-        try:
-            lineage = ncbi.get_lineage(taxid)
-            if not lineage:
-                print(f"Warning: No lineage found for taxid {taxid}, skipping")
-                continue
-
-            # Get names for all taxids in lineage
-            names = ncbi.get_taxid_translator(lineage)
-
-            # Build TAXPATH and TAXPATHSN
-            taxpath = '|'.join(map(str, lineage))
-            taxpathsn = '|'.join([names.get(tid, f'unknown_{tid}') for tid in lineage])
-
-            results.append({
-                'TAXID': taxid,
-                'RANK': rank,
-                'TAXPATH': taxpath,
-                'TAXPATHSN': taxpathsn,
-                'PERCENTAGE': percentage
-            })
-        except Exception as e:
-            print(f"Error processing taxid {taxid}: {e}")
-            continue
+        # TAXID, RANK, TAXPATH, TAXPATHSN are final; PERCENTAGE may still be rescaled
+        results.append('\t'.join((str(taxid), rank, taxpath_map[taxid], taxpathsn_map[taxid])))
+        percentages_out.append(percentage)
+        kept_values.append(value)
 
     if skipped > 0:
         print(f"Skipped {skipped} entries with unsupported ranks (root, no rank, etc.)")
 
     # Recalculate percentages to sum to 100%
-    total_percentage = sum(float(r['PERCENTAGE']) for r in results)
+    # (values were parsed once above; unchanged rows keep their original text)
+    total_percentage = sum(kept_values)
     if total_percentage > 0 and abs(total_percentage - 100.0) > 0.01:
         print(f"Renormalizing percentages (current sum: {total_percentage:.2f}%)")
-        for result in results:
-            result['PERCENTAGE'] = f"{float(result['PERCENTAGE']) / total_percentage * 100:.6f}"
+        scale = 100.0 / total_percentage
+        percentages_out = [f"{value * scale:.6f}" for value in kept_values]
 
     # Write output file
     print(f"Writing output file: {output_file}")
 
-    with open(output_file, 'w') as f:
+    with open(output_file, 'w', buffering=1 << 20, newline='\n') as f:
         # Write headers
         f.write(f"@SampleID:{sample_id}\n")
         f.write("@Version:0.9.1\n")
@@ -107,19 +117,20 @@ def fix_gold_standard(input_file, output_file, sample_id='gold_standard'):
         # Write column headers
         f.write("@@TAXID\tRANK\tTAXPATH\tTAXPATHSN\tPERCENTAGE\n")
 
-        # Write data
-        for result in results:
-            f.write(
-                f"{result['TAXID']}\t"
-                f"{result['RANK']}\t"
-                f"{result['TAXPATH']}\t"
-                f"{result['TAXPATHSN']}\t"
-                f"{result['PERCENTAGE']}\n"
-            )
+        # Write data with a single write call
+        if results:
+            f.write('\n'.join(map('\t'.join, zip(results, percentages_out))) + '\n')
 
     print(f"Successfully fixed {len(results)} entries")
     print(f"Output written to: {output_file}")
 
+    if cache_file:
+        try:
+            if save_cache(cache_file):
+                print(f"Updated taxonomy cache: {cache_file}")
+        except OSError as e:
+            print(f"Warning: Could not write taxonomy cache {cache_file}: {e}")
+
 def main():
     parser = argparse.ArgumentParser(
         description='Fix gold standard bioboxes file by reconstructing TAXPATH and TAXPATHSN'
@@ -139,10 +150,14 @@ def main():
         default='gold_standard',
         help='Sample ID for @SampleID header (default: gold_standard)'
     )
+    parser.add_argument(
+        '--cache-file',
+        help='Pickle file caching ete3 lookups between runs (created if missing)'
+    )
 
     args = parser.parse_args()
 
-    fix_gold_standard(args.input, args.output, args.sample_id)
+    fix_gold_standard(args.input, args.output, args.sample_id, args.cache_file)
 
 if __name__ == '__main__':
     main()
@@ -9,20 +9,35 @@ Author: taxbencher pipeline
 """
 
 import argparse
+import csv
+import importlib.util
 import sys
 import logging
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import pandas as pd
 
-# Try to import ete3 for taxonomy lookups
-try:
-    from ete3 import NCBITaxa
-    HAS_ETE3 = True
-except ImportError:
-    HAS_ETE3 = False
+from _taxonomy_cache import load_cache, load_lineages, save_cache
+
+# ete3 is only imported (and its database opened) on the first taxonomy lookup
+HAS_ETE3 = importlib.util.find_spec('ete3') is not None
+if not HAS_ETE3:
     logging.warning("ete3 not available, using simplified conversion mode")
 
+# Valid ranks for OPAL (standard CAMI ranks)
+VALID_RANKS = ('superkingdom', 'phylum', 'class', 'order', 'family', 'genus', 'species', 'strain')
+
+# Map non-standard ranks to standard ones
+RANK_MAPPING = {
+    'subspecies': 'strain',
+    'domain': 'superkingdom',
+    'kingdom': 'superkingdom'
+}
+
+# Every accepted rank -> canonical rank, in a single lookup
+RANK_LUT = {rank: rank for rank in VALID_RANKS}
+RANK_LUT.update(RANK_MAPPING)
+
 
 def setup_logging(verbose: bool = False):
     """Configure logging."""
@@ -34,42 +49,53 @@ def setup_logging(verbose: bool = False):
     )
 
 
-def get_taxonomy_info(taxid: int, ncbi: Optional['NCBITaxa'] = None) -> Tuple[str, str, str]:
+def simplified_taxonomy_info(taxid: int) -> Tuple[str, str, str]:
     """
-    Get taxonomy information for a given taxid.
+    Taxonomy information for a taxid without a taxonomy lookup.
 
-    Args:
-        taxid: NCBI taxonomy ID
-        ncbi: NCBITaxa object (optional)
+    Used when ete3 is unavailable or disabled, or the taxid cannot be resolved.
 
     Returns:
-        Tuple of (rank, taxpath, taxpathsn)
+        Tuple of (rank, taxpath, taxpathsn) with unknown rank and the taxid as its own path
     """
-    if not HAS_ETE3 or ncbi is None:
-        # Simplified mode: return taxid as-is with unknown rank
-        return "unknown", str(taxid), f"taxid_{taxid}"
+    return "unknown", str(taxid), f"taxid_{taxid}"
 
-    try:
-        # Get rank
-        rank = ncbi.get_rank([taxid]).get(taxid, "unknown")
 
-        # Get lineage
-        lineage = ncbi.get_lineage(taxid)
-        if lineage is None:
-            lineage = [taxid]
+def get_taxonomy_info_batch(
+    taxids: List[int],
+    use_ete3: bool = True
+) -> Dict[int, Tuple[str, str, str]]:
+    """
+    Get taxonomy information for many taxids with batched ete3 queries.
 
-        # Create taxpath (pipe-separated taxids)
-        taxpath = "|".join(str(tid) for tid in lineage)
+    Ranks and lineages are fetched in one query each, and names for the union of
+    all lineages in a third, instead of three queries per taxid. The taxonomy
+    database is only opened if some taxids are not cached yet.
 
-        # Get names for taxpathsn
-        name_dict = ncbi.get_taxid_translator(lineage)
-        taxpathsn = "|".join(name_dict.get(tid, f"taxid_{tid}") for tid in lineage)
+    Args:
+        taxids: NCBI taxonomy IDs
+        use_ete3: Whether to use ete3 for taxonomy lookups
 
-        return rank, taxpath, taxpathsn
+    Returns:
+        Dict mapping taxid to (rank, taxpath, taxpathsn)
+    """
+    if not HAS_ETE3 or not use_ete3 or not taxids:
+        return {taxid: simplified_taxonomy_info(taxid) for taxid in taxids}
 
+    try:
+        rank_map, taxpath_map, taxpathsn_map = load_lineages(taxids)
     except Exception as e:
-        logging.warning(f"Error getting taxonomy info for taxid {taxid}: {e}")
-        return "unknown", str(taxid), f"taxid_{taxid}"
+        logging.warning(f"Could not look up taxonomy with NCBITaxa: {e}. Using simplified mode.")
+        return {taxid: simplified_taxonomy_info(taxid) for taxid in taxids}
+
+    info = {}
+    for taxid in taxids:
+        if taxid not in taxpath_map:
+            logging.warning(f"Error getting taxonomy info for taxid {taxid}: not found in taxonomy database")
+            info[taxid] = simplified_taxonomy_info(taxid)
+            continue
+        info[taxid] = (rank_map.get(taxid, "unknown"), taxpath_map[taxid], taxpathsn_map[taxid])
+    return info
 
 
 def convert_taxpasta_to_bioboxes(
@@ -79,7 +105,8 @@ def convert_taxpasta_to_bioboxes(
     ranks: List[str],
     taxonomy_db: str = "NCBI",
     version: str = "0.9.1",
-    use_ete3: bool = True
+    use_ete3: bool = True,
+    cache_file: Optional[Path] = None
 ) -> None:
     """
     Convert taxpasta format to CAMI Bioboxes format.
@@ -92,12 +119,14 @@ def convert_taxpasta_to_bioboxes(
         taxonomy_db: Taxonomy database name (default: NCBI)
         version: Bioboxes format version (default: 0.9.1)
         use_ete3: Whether to use ete3 for taxonomy lookups
+        cache_file: Optional pickle file persisting taxonomy lookups across runs
     """
     logging.info(f"Reading taxpasta file: {input_file}")
 
     # Read taxpasta file
     try:
-        df = pd.read_csv(input_file, sep='\t', dtype={'taxonomy_id': str})
+        with open(input_file, 'r', buffering=1 << 20) as fh:
+            df = pd.read_csv(fh, sep='\t', dtype={'taxonomy_id': str})
     except Exception as e:
         logging.error(f"Error reading input file: {e}")
         sys.exit(1)
@@ -119,75 +148,51 @@ def convert_taxpasta_to_bioboxes(
     # Calculate total counts for percentage calculation
     total_counts = df['count'].sum()
 
-    # Initialize ete3 if requested and available
-    ncbi = None
-    if use_ete3 and HAS_ETE3:
-        logging.info("Initializing NCBI taxonomy database")
-        try:
-            ncbi = NCBITaxa()
-            # Update database if needed
-            # ncbi.update_taxonomy_database()  # Uncomment to force update
-        except Exception as e:
-            logging.warning(f"Could not initialize NCBITaxa: {e}. Using simplified mode.")
-            ncbi = None
-
-    # Valid ranks for OPAL (standard CAMI ranks)
-    valid_ranks = {'superkingdom', 'phylum', 'class', 'order', 'family', 'genus', 'species', 'strain'}
-
-    # Map non-standard ranks to standard ones
-    rank_mapping = {
-        'subspecies': 'strain',
-        'domain': 'superkingdom',
-        'kingdom': 'superkingdom'
-    }
-
-    # Process each taxonomy entry
-    results = []
-    skipped_ranks = set()
-    for idx, row in df.iterrows():
-        try:
-            taxid = int(row['taxonomy_id'])
-        except (ValueError, TypeError):
-            logging.warning(f"Invalid taxonomy_id: {row['taxonomy_id']}, skipping")
-            continue
-
-        count = row['count']
-        percentage = (count / total_counts * 100) if total_counts > 0 else 0
-
-        # Get taxonomy information
-        rank, taxpath, taxpathsn = get_taxonomy_info(taxid, ncbi)
-
-        # Skip unsupported ranks (root, no rank, unknown, cellular root, etc.)
-        if rank not in valid_ranks and rank not in rank_mapping:
-            skipped_ranks.add(rank)
-            continue
-
-        # Map non-standard ranks to standard ones
-        if rank in rank_mapping:
-            rank = rank_mapping[rank]
-
-        results.append({
-            'TAXID': taxid,
-            'RANK': rank,
-            'TAXPATH': taxpath,
-            'TAXPATHSN': taxpathsn,
-            'PERCENTAGE': f"{percentage:.6f}"
-        })
-
+    # Reuse lookups from earlier runs; stale caches (older taxonomy DB) are ignored
+    use_taxonomy_cache = use_ete3 and HAS_ETE3 and cache_file is not None
+    if use_taxonomy_cache and load_cache(cache_file):
+        logging.info(f"Loaded taxonomy cache: {cache_file}")
+
+    # Coerce taxonomy IDs in one vectorized pass; non-numeric and fractional IDs are invalid
+    taxids = pd.to_numeric(df['taxonomy_id'], errors='coerce')
+    valid = taxids.notna() & (taxids % 1 == 0)
+    for value in df.loc[~valid, 'taxonomy_id']:
+        logging.warning(f"Invalid taxonomy_id: {value}, skipping")
+    taxids = taxids[valid].astype('int64')
+
+    # Look up every distinct taxid once, before building the output columns
+    taxonomy = get_taxonomy_info_batch(sorted(taxids.unique().tolist()), use_ete3)
+
+    # Build all output columns at once from the lookup table
+    results = pd.DataFrame({
+        'TAXID': taxids,
+        'RANK': taxids.map({taxid: info[0] for taxid, info in taxonomy.items()}),
+        'TAXPATH': taxids.map({taxid: info[1] for taxid, info in taxonomy.items()}),
+        'TAXPATHSN': taxids.map({taxid: info[2] for taxid, info in taxonomy.items()}),
+        'PERCENTAGE': df.loc[valid, 'count'] / total_counts * 100 if total_counts > 0 else 0.0
+    })
+
+    # Map ranks to their canonical form; unsupported ranks (root, no rank, unknown,
+    # cellular root, etc.) map to NaN and are skipped
+    canonical_ranks = results['RANK'].map(RANK_LUT)
+    supported = canonical_ranks.notna()
+    skipped_ranks = set(results.loc[~supported, 'RANK'])
     if skipped_ranks:
         logging.info(f"Skipped {len(skipped_ranks)} unsupported ranks: {', '.join(sorted(skipped_ranks))}")
 
-    # Renormalize percentages to sum to 100%
-    total_percentage = sum(float(r['PERCENTAGE']) for r in results)
+    results = results[supported].assign(RANK=canonical_ranks[supported])
+
+    # Renormalize percentages to sum to 100% with a single scale factor; values stay
+    # float64 and are only formatted by to_csv when the file is written
+    total_percentage = results['PERCENTAGE'].sum()
     if total_percentage > 0 and abs(total_percentage - 100.0) > 0.01:
         logging.info(f"Renormalizing percentages (current sum: {total_percentage:.2f}%)")
-        for result in results:
-            result['PERCENTAGE'] = f"{float(result['PERCENTAGE']) / total_percentage * 100:.6f}"
+        results['PERCENTAGE'] *= 100.0 / total_percentage
 
     # Create output file with proper Bioboxes format
     logging.info(f"Writing Bioboxes file: {output_file}")
 
-    with open(output_file, 'w') as f:
+    with open(output_file, 'w', buffering=1 << 20, newline='\n') as f:
         # Write header
         f.write(f"@SampleID:{sample_id}\n")
         f.write(f"@Version:{version}\n")
@@ -197,18 +202,19 @@ def convert_taxpasta_to_bioboxes(
         # Write column headers
         f.write("@@TAXID\tRANK\tTAXPATH\tTAXPATHSN\tPERCENTAGE\n")
 
-        # Write data
-        for result in results:
-            f.write(
-                f"{result['TAXID']}\t"
-                f"{result['RANK']}\t"
-                f"{result['TAXPATH']}\t"
-                f"{result['TAXPATHSN']}\t"
-                f"{result['PERCENTAGE']}\n"
-            )
+        # Write data in one pass; names are written verbatim (no CSV quoting)
+        results.to_csv(f, sep='\t', header=False, index=False, float_format='%.6f',
+                       quoting=csv.QUOTE_NONE, lineterminator='\n')
 
     logging.info(f"Successfully converted {len(results)} entries")
 
+    if use_taxonomy_cache:
+        try:
+            if save_cache(cache_file):
+                logging.info(f"Updated taxonomy cache: {cache_file}")
+        except OSError as e:
+            logging.warning(f"Could not write taxonomy cache {cache_file}: {e}")
+
 
 def main():
     """Main entry point."""
@@ -270,6 +276,12 @@ Examples:
         action='store_true',
         help='Disable ete3 taxonomy lookups (simplified mode)'
     )
+    parser.add_argument(
+        '--cache-file',
+        type=Path,
+        default=None,
+        help='Pickle file caching ete3 lookups between runs (created if missing)'
+    )
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -303,7 +315,8 @@ Examples:
             ranks=ranks,
             taxonomy_db=args.taxonomy_db,
             version=args.version_bioboxes,
-            use_ete3=not args.no_ete3
+            use_ete3=not args.no_ete3,
+            cache_file=args.cache_file
         )
         logging.info("Conversion completed successfully")
     except Exception as e:
@@ -6,16 +6,19 @@ This script checks if a profiler output file is likely to be compatible with
 taxpasta standardisation based on basic format checks.
 
 Usage:
-    python3 validate_profiler_format.py <profiler> <file>
+    python3 validate_profiler_format.py <profiler> <file> [<file> ...]
 
 Examples:
     python3 validate_profiler_format.py kraken2 sample1.kreport
     python3 validate_profiler_format.py metaphlan sample1.profile
     python3 validate_profiler_format.py centrifuge sample1.report
+    python3 validate_profiler_format.py kraken2 *.kreport
 """
 
+import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
@@ -112,6 +115,9 @@ PROFILER_SPECS = {
     },
 }
 
+# Extension sets for membership checks; the lists above keep their order for display
+_EXTENSION_SETS = {name: frozenset(spec["extensions"]) for name, spec in PROFILER_SPECS.items()}
+
 
 def validate_file_format(profiler: str, file_path: Path) -> tuple[bool, list[str]]:
     """
@@ -132,6 +138,11 @@ def validate_file_format(profiler: str, file_path: Path) -> tuple[bool, list[str
         return False, issues
 
     spec = PROFILER_SPECS[profiler]
+    header_marker = spec.get("header_marker")
+    delimiter = spec["delimiter"]
+    min_cols = spec["min_columns"]
+    max_cols = spec["max_columns"]
+    expected_columns = ', '.join(spec['example_columns'])
 
     # Check file exists
     if not file_path.exists():
@@ -140,7 +151,7 @@ def validate_file_format(profiler: str, file_path: Path) -> tuple[bool, list[str
 
     # Check file extension
     file_ext = file_path.suffix
-    if file_ext not in spec["extensions"]:
+    if file_ext not in _EXTENSION_SETS[profiler]:
         issues.append(
             f"File extension '{file_ext}' does not match expected extensions for {profiler}"
         )
@@ -148,50 +159,49 @@ def validate_file_format(profiler: str, file_path: Path) -> tuple[bool, list[str
 
     # Read and validate file content
     try:
-        with open(file_path, "r") as f:
-            lines = [line.rstrip("\n") for line in f if line.strip()]
-
-        if not lines:
-            issues.append("File is empty")
-            return False, issues
-
-        # Check for header marker (e.g., MetaPhlAn uses #)
-        header_marker = spec.get("header_marker")
+        # Split off header lines (e.g., MetaPhlAn uses #)
         data_lines = []
         header_lines = []
 
-        for line in lines:
-            if header_marker and line.startswith(header_marker):
-                header_lines.append(line)
-            else:
-                data_lines.append(line)
+        # Only the first 10 data lines are checked, so stop reading there
+        with open(file_path, "r", buffering=1 << 18) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                line = line.rstrip("\n")
+                if header_marker and line.startswith(header_marker):
+                    header_lines.append(line)
+                else:
+                    data_lines.append(line)
+                    if len(data_lines) >= 10:
+                        break
+
+        if not data_lines and not header_lines:
+            issues.append("File is empty")
+            return False, issues
 
         if not data_lines:
             issues.append("File contains no data lines (only headers or empty)")
             return False, issues
 
         # Validate column counts in data lines
-        delimiter = spec["delimiter"]
-        min_cols = spec["min_columns"]
-        max_cols = spec["max_columns"]
-
         column_counts = {}
-        for i, line in enumerate(data_lines[:10], 1):  # Check first 10 data lines
-            cols = line.split(delimiter)
-            col_count = len(cols)
+        for i, line in enumerate(data_lines, 1):
+            # Only the count is used, so skip building the split list
+            col_count = line.count(delimiter) + 1
             column_counts[col_count] = column_counts.get(col_count, 0) + 1
 
             if min_cols is not None and col_count < min_cols:
                 issues.append(
                     f"Line {i}: Has {col_count} columns but {profiler} expects at least {min_cols}"
                 )
-                issues.append(f"  Expected columns: {', '.join(spec['example_columns'])}")
+                issues.append(f"  Expected columns: {expected_columns}")
 
             if max_cols is not None and col_count > max_cols:
                 issues.append(
                     f"Line {i}: Has {col_count} columns but {profiler} expects at most {max_cols}"
                 )
-                issues.append(f"  Expected columns: {', '.join(spec['example_columns'])}")
+                issues.append(f"  Expected columns: {expected_columns}")
 
         # Report column count summary
         if len(column_counts) > 1:
@@ -209,6 +219,42 @@ def validate_file_format(profiler: str, file_path: Path) -> tuple[bool, list[str
     return is_valid, issues
 
 
+def validate_files(profiler: str, files: list[Path]) -> list[tuple[bool, list[str]]]:
+    """
+    Validate several files against one profiler format, in input order.
+
+    Files are independent, so batches are spread over worker processes
+    (bounded by the CPU count). A single file is validated in this process.
+    """
+    if len(files) == 1:
+        return [validate_file_format(profiler, files[0])]
+
+    max_workers = max(1, min(len(files), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(validate_file_format, [profiler] * len(files), files))
+
+
+def print_report(profiler: str, file: Path, is_valid: bool, issues: list[str]) -> None:
+    """Print the validation report for one file; problems go to stderr."""
+    print(f"Validating {file} as {profiler} format...")
+
+    if is_valid:
+        print(f"✓ File appears to be valid {profiler} format")
+        if issues:
+            print("\nWarnings:")
+            for issue in issues:
+                print(f"  {issue}")
+    else:
+        print(f"\n✗ File does not appear to be valid {profiler} format\n", file=sys.stderr)
+        print("Issues found:", file=sys.stderr)
+        for issue in issues:
+            print(f"  • {issue}", file=sys.stderr)
+
+        print(f"\nFor format details, run:", file=sys.stderr)
+        print(f"  {sys.argv[0]} {profiler} --show-spec", file=sys.stderr)
+        print(f"\nSee docs/raw-inputs.md for comprehensive format documentation", file=sys.stderr)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Validate profiler output file format for taxbencher pipeline",
@@ -218,6 +264,7 @@ Examples:
     %(prog)s kraken2 sample1.kreport
     %(prog)s metaphlan sample1.profile
     %(prog)s centrifuge sample1.report
+    %(prog)s kraken2 *.kreport
 
 Supported profilers:
     """ + ", ".join(sorted(PROFILER_SPECS.keys())),
@@ -231,7 +278,8 @@ Supported profilers:
     parser.add_argument(
         "file",
         type=Path,
-        help="Path to profiler output file",
+        nargs="+",
+        help="Path to profiler output file(s)",
     )
 
     parser.add_argument(
@@ -264,29 +312,17 @@ Supported profilers:
         print()
         sys.exit(0)
 
-    # Validate file
-    print(f"Validating {args.file} as {profiler} format...")
-
-    is_valid, issues = validate_file_format(profiler, args.file)
-
-    if is_valid:
-        print(f"✓ File appears to be valid {profiler} format")
-        if issues:
-            print("\nWarnings:")
-            for issue in issues:
-                print(f"  {issue}")
-        sys.exit(0)
-    else:
-        print(f"\n✗ File does not appear to be valid {profiler} format\n", file=sys.stderr)
-        print("Issues found:", file=sys.stderr)
-        for issue in issues:
-            print(f"  • {issue}", file=sys.stderr)
-
-        print(f"\nFor format details, run:", file=sys.stderr)
-        print(f"  {sys.argv[0]} {profiler} --show-spec", file=sys.stderr)
-        print(f"\nSee docs/raw-inputs.md for comprehensive format documentation", file=sys.stderr)
-
-        sys.exit(1)
+    # Validate files
+    all_valid = True
+    for i, (file, (is_valid, issues)) in enumerate(
+        zip(args.file, validate_files(profiler, args.file))
+    ):
+        if i:
+            print()
+        print_report(profiler, file, is_valid, issues)
+        all_valid &= is_valid
+
+    sys.exit(0 if all_valid else 1)
 
 
 if __name__ == "__main__":
@@ -6,16 +6,56 @@ This script validates that a file conforms to the taxpasta standardized
 format requirements before being used in the taxbencher pipeline.
 
 Usage:
-    validate_taxpasta.py <input_file>
+    validate_taxpasta.py <input_file> [<input_file> ...]
 
 Author: taxbencher pipeline
 """
 
 import argparse
+import importlib.util
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+# pandas and numpy are imported where they are used, so --help and argument
+# errors return without paying their import time
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pyarrow's multithreaded CSV reader is used when available
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+def _read_taxpasta(input_file: Path) -> 'pd.DataFrame':
+    """
+    Read a taxpasta TSV into a DataFrame.
+
+    With pyarrow installed, taxonomy_id and count are parsed as numbers by
+    pyarrow's CSV reader. Files it rejects (empty files, non-numeric values)
+    are read with pandas instead, so they get the detailed error reports.
+    """
+    import pandas as pd
+
+    if HAS_PYARROW:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        try:
+            table = pa_csv.read_csv(
+                str(input_file),
+                parse_options=pa_csv.ParseOptions(delimiter='\t'),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={'taxonomy_id': pa.int64(), 'count': pa.float64()}
+                )
+            )
+            # Plain to_pandas() gives the same dtypes read_csv would infer
+            return table.to_pandas()
+        except pa.ArrowInvalid:
+            pass
+
+    return pd.read_csv(input_file, sep='\t', engine='c')
 
 
 def validate_taxpasta(input_file: Path) -> Tuple[bool, List[str], Dict[str, any]]:
@@ -28,24 +68,21 @@ def validate_taxpasta(input_file: Path) -> Tuple[bool, List[str], Dict[str, any]
     Returns:
         Tuple of (is_valid, errors, statistics)
     """
+    import numpy as np
+    import pandas as pd
+
     errors = []
     stats = {}
 
-    # Check file exists
-    if not input_file.exists():
-        return False, [f"File not found: {input_file}"], {}
-
-    # Check file is readable
+    # Read file; a missing or unreadable file surfaces from the open itself,
+    # so there is no separate existence check or sniff read
     try:
-        with open(input_file, 'r') as f:
-            first_line = f.readline()
-    except Exception as e:
-        return False, [f"Cannot read file: {e}"], {}
-
-    # Read file
-    try:
-        df = pd.read_csv(input_file, sep='\t')
+        df = _read_taxpasta(input_file)
         stats['total_rows'] = len(df)
+    except FileNotFoundError:
+        return False, [f"File not found: {input_file}"], {}
+    except OSError as e:
+        return False, [f"Cannot read file: {e}"], {}
     except pd.errors.EmptyDataError:
         return False, ["File is empty"], {}
     except Exception as e:
@@ -63,6 +100,17 @@ def validate_taxpasta(input_file: Path) -> Tuple[bool, List[str], Dict[str, any]
     # Check taxonomy_id column
     stats['total_entries'] = len(df)
 
+    # Coerce both columns to float arrays once and derive every mask from
+    # them; the C parser already infers numeric dtypes for valid files, so
+    # to_numeric is a no-op there
+    tid = pd.to_numeric(df['taxonomy_id'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    cnt = pd.to_numeric(df['count'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    tid_nan = np.isnan(tid)
+    cnt_nan = np.isnan(cnt)
+    # NaN compares False, so these only flag parsed values
+    tid_nonpos = tid <= 0
+    cnt_nonpos = cnt <= 0
+
     # Check for missing taxonomy_id
     missing_taxid = df['taxonomy_id'].isna().sum()
     if missing_taxid > 0:
@@ -70,26 +118,19 @@ def validate_taxpasta(input_file: Path) -> Tuple[bool, List[str], Dict[str, any]
         stats['missing_taxonomy_id'] = missing_taxid
 
     # Check taxonomy_id are valid (convertible to int)
-    try:
-        df['taxonomy_id_int'] = pd.to_numeric(df['taxonomy_id'], errors='coerce')
-        invalid_taxid = df['taxonomy_id_int'].isna().sum()
-        if invalid_taxid > 0:
-            errors.append(f"Found {invalid_taxid} rows with invalid taxonomy_id (not convertible to integer)")
-            stats['invalid_taxonomy_id'] = invalid_taxid
-            # Show examples
-            invalid_examples = df[df['taxonomy_id_int'].isna()]['taxonomy_id'].head(5).tolist()
-            errors.append(f"  Examples: {invalid_examples}")
-    except Exception as e:
-        errors.append(f"Error validating taxonomy_id: {e}")
+    invalid_taxid = tid_nan.sum()
+    if invalid_taxid > 0:
+        errors.append(f"Found {invalid_taxid} rows with invalid taxonomy_id (not convertible to integer)")
+        stats['invalid_taxonomy_id'] = invalid_taxid
+        # Show examples
+        invalid_examples = df.loc[tid_nan, 'taxonomy_id'].head(5).tolist()
+        errors.append(f"  Examples: {invalid_examples}")
 
     # Check for negative or zero taxonomy_id
-    if 'taxonomy_id_int' in df.columns:
-        valid_taxids = df['taxonomy_id_int'].dropna()
-        if len(valid_taxids) > 0:
-            negative_taxid = (valid_taxids <= 0).sum()
-            if negative_taxid > 0:
-                errors.append(f"Found {negative_taxid} rows with non-positive taxonomy_id")
-                stats['negative_taxonomy_id'] = negative_taxid
+    negative_taxid = tid_nonpos.sum()
+    if negative_taxid > 0:
+        errors.append(f"Found {negative_taxid} rows with non-positive taxonomy_id")
+        stats['negative_taxonomy_id'] = negative_taxid
 
     # Check count column
     # Check for missing counts
@@ -99,58 +140,92 @@ def validate_taxpasta(input_file: Path) -> Tuple[bool, List[str], Dict[str, any]
         stats['missing_count'] = missing_count
 
     # Check counts are numeric
-    try:
-        df['count_numeric'] = pd.to_numeric(df['count'], errors='coerce')
-        invalid_count = df['count_numeric'].isna().sum()
-        if invalid_count > 0:
-            errors.append(f"Found {invalid_count} rows with invalid count (not numeric)")
-            stats['invalid_count'] = invalid_count
-            # Show examples
-            invalid_examples = df[df['count_numeric'].isna()]['count'].head(5).tolist()
-            errors.append(f"  Examples: {invalid_examples}")
-    except Exception as e:
-        errors.append(f"Error validating count: {e}")
+    invalid_count = cnt_nan.sum()
+    if invalid_count > 0:
+        errors.append(f"Found {invalid_count} rows with invalid count (not numeric)")
+        stats['invalid_count'] = invalid_count
+        # Show examples
+        invalid_examples = df.loc[cnt_nan, 'count'].head(5).tolist()
+        errors.append(f"  Examples: {invalid_examples}")
 
     # Check for negative or zero counts
-    if 'count_numeric' in df.columns:
-        valid_counts = df['count_numeric'].dropna()
-        if len(valid_counts) > 0:
-            negative_count = (valid_counts <= 0).sum()
-            if negative_count > 0:
-                errors.append(f"Found {negative_count} rows with non-positive count")
-                stats['negative_count'] = negative_count
-
-            # Statistics on counts
-            stats['total_reads'] = int(valid_counts.sum())
-            stats['min_count'] = int(valid_counts.min())
-            stats['max_count'] = int(valid_counts.max())
-            stats['mean_count'] = float(valid_counts.mean())
-
-    # Check for duplicates
-    if 'taxonomy_id_int' in df.columns:
-        valid_df = df.dropna(subset=['taxonomy_id_int'])
-        duplicates = valid_df['taxonomy_id_int'].duplicated().sum()
-        if duplicates > 0:
-            errors.append(f"Found {duplicates} duplicate taxonomy_id entries")
-            stats['duplicate_taxonomy_id'] = duplicates
-            # Show examples
-            dup_taxids = valid_df[valid_df['taxonomy_id_int'].duplicated(keep=False)]['taxonomy_id'].head(10).tolist()
-            errors.append(f"  Examples: {dup_taxids}")
+    valid_counts = cnt[~cnt_nan]
+    if len(valid_counts) > 0:
+        negative_count = cnt_nonpos.sum()
+        if negative_count > 0:
+            errors.append(f"Found {negative_count} rows with non-positive count")
+            stats['negative_count'] = negative_count
+
+        # Statistics on counts
+        stats['total_reads'] = int(valid_counts.sum())
+        stats['min_count'] = int(valid_counts.min())
+        stats['max_count'] = int(valid_counts.max())
+        stats['mean_count'] = float(valid_counts.mean())
+
+    # Check for duplicates: one sort of the parsed IDs gives every count, and
+    # each repeated ID contributes all but its first occurrence
+    uniq, counts = np.unique(tid[~tid_nan], return_counts=True)
+    repeated = counts > 1
+    duplicates = counts[repeated].sum() - repeated.sum()
+    if duplicates > 0:
+        errors.append(f"Found {duplicates} duplicate taxonomy_id entries")
+        stats['duplicate_taxonomy_id'] = duplicates
+        # Show examples
+        dup_mask = np.isin(tid, uniq[repeated])
+        dup_taxids = df.loc[dup_mask, 'taxonomy_id'].head(10).tolist()
+        errors.append(f"  Examples: {dup_taxids}")
 
     # Count valid rows
-    if 'taxonomy_id_int' in df.columns and 'count_numeric' in df.columns:
-        valid_rows = df.dropna(subset=['taxonomy_id_int', 'count_numeric'])
-        valid_rows = valid_rows[
-            (valid_rows['taxonomy_id_int'] > 0) &
-            (valid_rows['count_numeric'] > 0)
-        ]
-        stats['valid_rows'] = len(valid_rows)
-        stats['unique_taxa'] = valid_rows['taxonomy_id_int'].nunique()
+    valid_rows = ~(tid_nan | tid_nonpos | cnt_nan | cnt_nonpos)
+    stats['valid_rows'] = int(valid_rows.sum())
+    stats['unique_taxa'] = len(np.unique(tid[valid_rows]))
 
     is_valid = len(errors) == 0
     return is_valid, errors, stats
 
 
+def validate_files(input_files: List[Path]) -> List[Tuple[bool, List[str], Dict[str, any]]]:
+    """
+    Validate several files, in input order.
+
+    Files are independent, so batches are spread over worker processes (bounded
+    by the CPU count); each worker pays the interpreter and pandas import cost
+    once for many files. A single file is validated in this process.
+    """
+    if len(input_files) == 1:
+        return [validate_taxpasta(input_files[0])]
+
+    max_workers = max(1, min(len(input_files), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(validate_taxpasta, input_files))
+
+
+def print_report(input_file: Path, is_valid: bool, errors: List[str], stats: Dict[str, any]) -> None:
+    """Print the validation report for one file."""
+    print(f"Validating: {input_file}")
+    print("-" * 60)
+
+    # Print statistics
+    if stats:
+        print("\nStatistics:")
+        for key, value in stats.items():
+            print(f"  {key}: {value}")
+
+    # Print errors
+    if errors:
+        print("\nValidation Issues:")
+        for error in errors:
+            print(f"  ✗ {error}")
+
+    # Print result
+    print("\n" + "-" * 60)
+    if is_valid:
+        print("✓ VALID: File conforms to taxpasta format")
+    else:
+        print("✗ INVALID: File has format issues")
+        print("\nPlease fix the issues above before using this file.")
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -161,8 +236,8 @@ Examples:
   # Validate a taxpasta file
   validate_taxpasta.py sample1_kraken2.tsv
 
-  # Validate multiple files
-  for f in *.tsv; do validate_taxpasta.py "$f"; done
+  # Validate multiple files (in parallel, one report per file)
+  validate_taxpasta.py *.tsv
 
 Format requirements:
   - Tab-separated values (TSV)
@@ -173,38 +248,22 @@ Format requirements:
   - No duplicate taxonomy_id values
         '''
     )
-    parser.add_argument('input_file', type=Path, help='Input taxpasta TSV file')
+    parser.add_argument('input_file', type=Path, nargs='+', help='Input taxpasta TSV file(s)')
     parser.add_argument('--strict', action='store_true',
                        help='Exit with error on any validation warning')
 
     args = parser.parse_args()
 
-    print(f"Validating: {args.input_file}")
-    print("-" * 60)
-
-    is_valid, errors, stats = validate_taxpasta(args.input_file)
+    all_valid = True
+    for i, (input_file, (is_valid, errors, stats)) in enumerate(
+        zip(args.input_file, validate_files(args.input_file))
+    ):
+        if i:
+            print()
+        print_report(input_file, is_valid, errors, stats)
+        all_valid &= is_valid
 
-    # Print statistics
-    if stats:
-        print("\nStatistics:")
-        for key, value in stats.items():
-            print(f"  {key}: {value}")
-
-    # Print errors
-    if errors:
-        print("\nValidation Issues:")
-        for error in errors:
-            print(f"  ✗ {error}")
-
-    # Print result
-    print("\n" + "-" * 60)
-    if is_valid:
-        print("✓ VALID: File conforms to taxpasta format")
-        return 0
-    else:
-        print("✗ INVALID: File has format issues")
-        print("\nPlease fix the issues above before using this file.")
-        return 1 if args.strict else 0
+    return 1 if args.strict and not all_valid else 0
 
 
 if __name__ == '__main__':
@@ -17,6 +17,7 @@ process COMPARATIVE_ANALYSIS {
     tuple val(meta), path("*_diff_taxa.tsv")     , emit: diff_taxa
     tuple val(meta), path("*_comparison.html")   , emit: comparison_report
     path "versions.yml"                          , emit: versions
+    tuple val(meta), path("*_diff_taxa.parquet") , emit: diff_taxa_parquet, optional: true
 
     when:
     task.ext.when == null || task.ext.when
@@ -33,7 +34,8 @@ process COMPARATIVE_ANALYSIS {
         --gold-standard ${gold_standard} \\
         --sample-id ${sample_id} \\
         --labels "${labels}" \\
-        --output-prefix ${prefix}
+        --output-prefix ${prefix} \\
+        ${args}
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
@@ -0,0 +1,59 @@
+"""
+Tests for bin/comparative_analysis.py
+
+Run with: python -m pytest tests/bin
+"""
+
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+BIN_DIR = Path(__file__).resolve().parents[2] / 'bin'
+sys.path.insert(0, str(BIN_DIR))
+
+HAS_ANALYSIS_DEPS = all(
+    importlib.util.find_spec(name) is not None for name in ('pandas', 'numpy', 'scipy')
+)
+
+if HAS_ANALYSIS_DEPS:
+    import pandas as pd
+    import comparative_analysis
+
+
+@unittest.skipUnless(HAS_ANALYSIS_DEPS, "pandas, numpy and scipy are required")
+class DifferentialAbundanceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.tmp_dir = Path(self.tmp.name)
+        comparative_analysis.load_gold_abundances.cache_clear()
+
+    def write(self, name: str, content: str) -> Path:
+        path = self.tmp_dir / name
+        path.write_text(content)
+        return path
+
+    def test_blank_taxid_row_is_written_as_placeholder(self):
+        gold = self.write('gold.bioboxes', "TAXID\tPERCENTAGE\n562\t50.0\n1280\t50.0\n")
+        profile = self.write('kraken2.bioboxes', "TAXID\tPERCENTAGE\n562\t40.0\n\t10.0\n1280\t50.0\n")
+        output_file = self.tmp_dir / 'sample1_diff_taxa.tsv'
+
+        profiles = {'kraken2': comparative_analysis.read_bioboxes_table(profile)}
+        comparative_analysis.perform_differential_abundance(gold, profiles, ['kraken2'], output_file)
+
+        diff_df = pd.read_csv(output_file, sep='\t')
+        self.assertEqual(sorted(diff_df['taxid']), [-1, 562])
+        blank_row = diff_df[diff_df['taxid'] == -1].iloc[0]
+        self.assertEqual(blank_row['observed_pct'], 10.0)
+        self.assertEqual(blank_row['expected_pct'], 0.0)
+
+        parquet_file = output_file.with_suffix('.parquet')
+        if parquet_file.exists():
+            self.assertEqual(sorted(pd.read_parquet(parquet_file)['taxid']), [-1, 562])
+
+
+if __name__ == '__main__':
+    unittest.main()
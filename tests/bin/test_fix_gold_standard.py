@@ -0,0 +1,71 @@
+"""
+Tests for bin/fix_gold_standard.py
+
+Run with: python -m pytest tests/bin
+"""
+
+import contextlib
+import importlib.util
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+BIN_DIR = Path(__file__).resolve().parents[2] / 'bin'
+sys.path.insert(0, str(BIN_DIR))
+
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+
+if HAS_PANDAS:
+    import fix_gold_standard
+
+
+def fake_load_lineages(taxids, unknown_name='unknown_{}', with_ranks=True):
+    """Stand-in for the ete3 lookup: every taxid resolves to root|taxid."""
+    taxids = list(taxids)
+    return {}, {taxid: f"1|{taxid}" for taxid in taxids}, {taxid: f"root|taxon_{taxid}" for taxid in taxids}
+
+
+@unittest.skipUnless(HAS_PANDAS, "pandas is required")
+class MalformedLineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.tmp_dir = Path(self.tmp.name)
+
+    def fix(self, content: str):
+        input_file = self.tmp_dir / 'gold.bioboxes'
+        output_file = self.tmp_dir / 'fixed.bioboxes'
+        input_file.write_text(content)
+        stdout = io.StringIO()
+        with mock.patch.object(fix_gold_standard, 'load_lineages', fake_load_lineages), \
+                contextlib.redirect_stdout(stdout):
+            fix_gold_standard.fix_gold_standard(input_file, output_file)
+        data_rows = [line for line in output_file.read_text().splitlines() if not line.startswith('@')]
+        return stdout.getvalue(), data_rows
+
+    def test_row_with_extra_fields_is_reported_as_malformed(self):
+        log, rows = self.fix(
+            "@SampleID:test\n"
+            "@@TAXID\tRANK\tTAXPATH\tTAXPATHSN\tPERCENTAGE\n"
+            "562\tspecies\t2|562\tBacteria|Escherichia coli\t100.0\n"
+            "1\t2\t3\t4\t5\t6\t7\n"
+        )
+        self.assertIn("Processing 2 entries...", log)
+        self.assertIn("Warning: Skipping malformed line: 1\t2\t3\t4\t5\t6\t7", log)
+        self.assertEqual([row.split('\t')[0] for row in rows], ['562'])
+
+    def test_trailing_empty_fields_are_ignored(self):
+        log, rows = self.fix(
+            "562\tspecies\t2|562\tBacteria|Escherichia coli\t60.0\t\t\n"
+            "1280\tspecies\tStaphylococcus aureus\t40.0\n"
+        )
+        self.assertNotIn("malformed", log)
+        self.assertEqual([row.split('\t')[0] for row in rows], ['562', '1280'])
+
+
+if __name__ == '__main__':
+    unittest.main()
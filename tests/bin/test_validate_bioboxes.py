@@ -0,0 +1,60 @@
+"""
+Tests for bin/validate_bioboxes.py
+
+Run with: python -m pytest tests/bin
+"""
+
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+BIN_DIR = Path(__file__).resolve().parents[2] / 'bin'
+sys.path.insert(0, str(BIN_DIR))
+
+HAS_VALIDATOR_DEPS = all(importlib.util.find_spec(name) is not None for name in ('pandas', 'numpy'))
+
+if HAS_VALIDATOR_DEPS:
+    import validate_bioboxes
+
+HEADER = (
+    "@SampleID:test_sample\n"
+    "@Version:0.9.1\n"
+    "@Ranks:superkingdom|phylum\n"
+    "@TaxonomyID:NCBI\n"
+    "@@TAXID\tRANK\tTAXPATH\tTAXPATHSN\tPERCENTAGE\n"
+)
+
+
+@unittest.skipUnless(HAS_VALIDATOR_DEPS, "pandas and numpy are required")
+class TaxpathTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def validate(self, data: str):
+        path = Path(self.tmp.name) / 'profile.bioboxes'
+        path.write_text(HEADER + data, encoding='utf-8')
+        return validate_bioboxes.validate_bioboxes(path)
+
+    def test_valid_taxpath(self):
+        is_valid, errors, _ = self.validate(
+            "2\tsuperkingdom\t2\tBacteria\t50.0\n"
+            "1224\tphylum\t2|1224\tBacteria|Pseudomonadota\t50.0\n"
+        )
+        self.assertTrue(is_valid, errors)
+
+    def test_non_decimal_digit_in_taxpath_is_reported(self):
+        # '²' passes str.isdigit() but int() rejects it
+        is_valid, errors, _ = self.validate(
+            "1\tphylum\t2|²\ta|b\t50.0\n"
+            "2\tsuperkingdom\t2\tb\t50.0\n"
+        )
+        self.assertFalse(is_valid)
+        self.assertIn("Line 6: TAXPATH contains non-integer: ²", errors)
+
+
+if __name__ == '__main__':
+    unittest.main()